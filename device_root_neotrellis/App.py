@@ -0,0 +1,511 @@
+# rpico_rgb_keypad_obs v1.0.1
+#
+# SPDX-FileCopyrightText: 2023 Martin Looker
+#
+# SPDX-License-Identifier: MIT
+#
+# DESCRIPTION
+#
+# This code provides a controller for OBS studio acting as a USB keyboard
+#
+# Keys are as follows:
+#
+# Green:
+#   11 scene keys, only one scene can be active at a time
+# Cyan, Blue:
+#   2 general keys
+# Red, Yellow, Magenta:
+#   3 toggle keys different key combos are sent when toggling on or off, so map these to start/stop
+#   hotkeys for start/stop streaming etc
+#
+# HARDWARE
+#
+# https://www.raspberrypi.com/documentation/microcontrollers/raspberry-pi-pico.html
+# https://shop.pimoroni.com/products/pico-rgb-keypad-base
+#
+# LIBRARIES
+#
+# adafruit:
+#   https://circuitpython.org/board/raspberry_pi_pico/
+#   https://github.com/adafruit/Adafruit_DotStar
+#   https://github.com/adafruit/Adafruit_CircuitPython_HID
+#   https://github.com/adafruit/Adafruit_CircuitPython_Ticks
+#
+# pimoroni:
+#   https://github.com/pimoroni/pmk-circuitpython
+#
+# SOFTWARE
+#
+# Inspired by:
+#   https://github.com/pimoroni/pmk-circuitpython/blob/main/examples/obs-studio-toggle-and-mutex.py
+
+# Standard imports
+import time
+import board
+from supervisor import ticks_ms
+
+# CircuitPython library imports
+#from adafruit_hid.keyboard_layout_us import KeyboardLayoutUS
+from adafruit_hid.keycode import Keycode
+from adafruit_ticks import ticks_add, ticks_diff
+from micropython import const
+
+# CircuitPython library hardware imports
+# from pmk import PMK, number_to_xy, hsv_to_rgb                     # For Keybow 2040 and Pico RGB Keypad Base
+# from pmk.platform.keybow2040 import Keybow2040 as Hardware        # For Keybow 2040
+# from pmk.platform.rgbkeypadbase import RGBKeypadBase as Hardware  # For Pico RGB Keypad Base
+from adafruit_neotrellis.neotrellis import NeoTrellis               # For Adafuit NeoTrellis also requires adafruit_seesaw and adafruit_bus_device
+
+# When true keycodes are sent
+KC_LIVE = False
+
+# When true debug messages are printed
+DEBUG = False
+
+# Debug output, printing goes over USB and is slow so this does nothing unless DEBUG is set
+if DEBUG:
+    _dbg = print
+else:
+    def _dbg(*args):
+        pass
+
+# LED Hues, as degrees (0-359) around the colour wheel in 15 degree steps
+# const names starting with an underscore are folded in at compile time and take no RAM
+_HUE_RED      = const(  0)
+_HUE_RRY      = const( 15)
+_HUE_RY       = const( 30)
+_HUE_RYY      = const( 45)
+_HUE_YELLOW   = const( 60)
+_HUE_YYG      = const( 75)
+_HUE_YG       = const( 90)
+_HUE_YGG      = const(105)
+_HUE_GREEN    = const(120)
+_HUE_GGC      = const(135)
+_HUE_GC       = const(150)
+_HUE_GCC      = const(165)
+_HUE_CYAN     = const(180)
+_HUE_CCB      = const(195)
+_HUE_CB       = const(210)
+_HUE_CBB      = const(225)
+_HUE_BLUE     = const(240)
+_HUE_BBM      = const(255)
+_HUE_BM       = const(270)
+_HUE_BMM      = const(285)
+_HUE_MAGENTA  = const(300)
+_HUE_MMR      = const(315)
+_HUE_MR       = const(330)
+_HUE_MRR      = const(345)
+
+# Hue:
+#   Set this for the pad color.
+#
+# Group:
+#   Set this to group pads together to operate like radio buttons (good for
+#   scene selection). You can have many separate groups of keys as set by the
+#   string set for the group
+#
+# Keycodes On:
+#   These are the keyboard codes to be sent for normal, grouped and toggle on
+#   pads.
+#
+# Keycodes Off:
+#   These are the keyboard codes to be sent for toggle off pads, setting this
+#   makes a toggle button, good for start/stop streaming
+#
+# Note:
+#   Pads configured as toggles will be removed from any groups
+#
+config = [
+    {"hue": _HUE_RED, "group": "scene", "keycodes_on": [Keycode.F13],                  "keycodes_off": None                        }, # 0
+    {"hue": _HUE_RRY, "group": "scene", "keycodes_on": [Keycode.F14],                  "keycodes_off": None                        }, # 1
+    {"hue": _HUE_RY, "group": "scene", "keycodes_on": [Keycode.F15],                  "keycodes_off": None                        }, # 2
+    {"hue": _HUE_YELLOW, "group": "scene", "keycodes_on": [Keycode.F16],                  "keycodes_off": None                        }, # 3
+    {"hue": _HUE_YYG, "group": "scene", "keycodes_on": [Keycode.F17],                  "keycodes_off": None                        }, # 4
+    {"hue": _HUE_YG, "group": "scene", "keycodes_on": [Keycode.F18],                  "keycodes_off": None                        }, # 5
+    {"hue": _HUE_GREEN, "group": "scene", "keycodes_on": [Keycode.F19],                  "keycodes_off": None                        }, # 6
+    {"hue": _HUE_GGC, "group": "scene", "keycodes_on": [Keycode.F20],                  "keycodes_off": None                        }, # 7
+    {"hue": _HUE_CYAN, "group": "scene", "keycodes_on": [Keycode.F21],                  "keycodes_off": None                        }, # 8
+    {"hue": _HUE_CCB, "group": "scene", "keycodes_on": [Keycode.F22],                  "keycodes_off": None                        }, # 9
+    {"hue": _HUE_CB, "group": "scene", "keycodes_on": [Keycode.F23],                  "keycodes_off": None                        }, # A
+    {"hue": _HUE_BLUE, "group": "scene", "keycodes_on": [Keycode.F24],                  "keycodes_off": None                        }, # B
+    {"hue": _HUE_BBM   , "group": None,    "keycodes_on": [Keycode.SHIFT,   Keycode.F13], "keycodes_off": [Keycode.SHIFT, Keycode.F13]}, # C
+    {"hue": _HUE_BM   , "group": None,    "keycodes_on": [Keycode.SHIFT,   Keycode.F14], "keycodes_off": [Keycode.SHIFT, Keycode.F14]}, # D
+    {"hue": _HUE_MAGENTA  , "group": None,    "keycodes_on": [Keycode.CONTROL, Keycode.F13], "keycodes_off": [Keycode.ALT,   Keycode.F13]}, # E
+    {"hue": _HUE_MMR    , "group": None   , "keycodes_on": [Keycode.CONTROL, Keycode.F14], "keycodes_off": [Keycode.ALT,   Keycode.F14]}  # F
+]
+
+#config = [
+#    {"hue": _HUE_YG     , "group": "scene", "keycodes_on": [Keycode.F13],                  "keycodes_off": None                      }, # 0
+#    {"hue": _HUE_YELLOW , "group": "scene", "keycodes_on": [Keycode.F14],                  "keycodes_off": None                      }, # 1
+#    {"hue": _HUE_YG     , "group": "scene", "keycodes_on": [Keycode.F15],                  "keycodes_off": None                      }, # 2
+#    {"hue": _HUE_RED    , "group": None   , "keycodes_on": [Keycode.CONTROL, Keycode.F13], "keycodes_off": [Keycode.ALT, Keycode.F13]}, # 3
+#    {"hue": _HUE_GC     , "group": "scene", "keycodes_on": [Keycode.F16],                  "keycodes_off": None                      }, # 4
+#    {"hue": _HUE_GREEN  , "group": "scene", "keycodes_on": [Keycode.F17],                  "keycodes_off": None                      }, # 5
+#    {"hue": _HUE_GC     , "group": "scene", "keycodes_on": [Keycode.F18],                  "keycodes_off": None                      }, # 6
+#    {"hue": _HUE_RRY    , "group": None   , "keycodes_on": [Keycode.CONTROL, Keycode.F14], "keycodes_off": [Keycode.ALT, Keycode.F14]}, # 7
+#    {"hue": _HUE_CB     , "group": "scene", "keycodes_on": [Keycode.F19],                  "keycodes_off": None                      }, # 8
+#    {"hue": _HUE_CYAN   , "group": "scene", "keycodes_on": [Keycode.F20],                  "keycodes_off": None                      }, # 9
+#    {"hue": _HUE_CB     , "group": "scene", "keycodes_on": [Keycode.F21],                  "keycodes_off": None                      }, # A
+#    {"hue": _HUE_RY     , "group": None,    "keycodes_on": [Keycode.SHIFT, Keycode.F13]  , "keycodes_off": None                      }, # B
+#    {"hue": _HUE_BM     , "group": "scene", "keycodes_on": [Keycode.F22],                  "keycodes_off": None                      }, # C
+#    {"hue": _HUE_BLUE   , "group": "scene", "keycodes_on": [Keycode.F23],                  "keycodes_off": None                      }, # D
+#    {"hue": _HUE_BM     , "group": "scene", "keycodes_on": [Keycode.F24],                  "keycodes_off": None                      }, # E
+#    {"hue": _HUE_RYY    , "group": None   , "keycodes_on": [Keycode.CONTROL, Keycode.F16], "keycodes_off": [Keycode.ALT, Keycode.F16]}  # F
+#]
+
+# LED Values (brightness), as integer levels indexing each pad's RGB lookup table
+VAL_MIN   =  0
+VAL_OFF   =  3 # ~2/32
+VAL_ON    = 47 # ~30/32
+VAL_MAX   = 50
+VAL_STEP  =  1
+
+# Set up the keyboard and layout
+# Only imported when keycodes are sent, boards without USB device support have no usb_hid
+if KC_LIVE:
+    import usb_hid
+    from adafruit_hid.keyboard import Keyboard
+    keyboard = Keyboard(usb_hid.devices)
+#layout = KeyboardLayoutUS(keyboard)
+
+# Set up Keybow 2040 and Pico RGB Keypad Base hardware 
+# keybow = PMK(Hardware())
+# keys = keybow.keys
+
+# The (r, g, b) components for each sextant of the hue circle, as indexes into (v, t, p, q)
+HSV_SEXTANT = ((0, 1, 2), (3, 0, 2), (2, 0, 1), (2, 3, 0), (1, 2, 0), (0, 2, 3))
+
+# HSV to RGB conversion from https://stackoverflow.com/questions/24152553/hsv-to-rgb-and-back-without-floating-point-math-in-python
+def hsv_to_rgb_int(h, s, v):
+    # Convert an H (0-359) SV (0-255) colour to RGB (0-255)
+    # Make hue 0-5
+    region = h // 60
+
+    # Find remainder part, 0-59
+    remainder = h % 60
+
+    # Calculate temp vars, doing integer multiplication, no need for a grayscale special case as t, p and q all equal v
+    p = (v * (255 - s)) // 255
+    q = (v * (255 - (s * remainder) // 60)) // 255
+    t = (v * (255 - (s * (60 - remainder)) // 60)) // 255
+
+    # Assign temp vars based on color cone region
+    r, g, b = HSV_SEXTANT[region % 6]
+    c = (v, t, p, q)
+
+    return (c[r], c[g], c[b])
+
+# Works out the runtime data for a pad from its config, all in one dict so the config is updated in one go
+def classify_pad(pad):
+    # Defaults, no mode, keep configured group
+    mode = None
+    group = pad["group"]
+    # This is a toggle pad ?
+    if pad["keycodes_off"] != None and len(pad["keycodes_off"]) and len(pad["keycodes_on"]):
+        # Mode is toggle
+        mode = "toggle"
+        # Can't be in a group
+        group = None
+    # This is a grouped pad ?
+    elif group != None and len(pad["keycodes_on"]):
+        # Mode is group
+        mode = "group"
+    # This is a key pad ?
+    elif len(pad["keycodes_on"]):
+        # Mode is key
+        mode = "key"
+    # Start with no saturation (white)
+    h = 0
+    s = 0
+    # Pad has a hue ?
+    if pad["hue"] is not None:
+        # Set full saturation
+        s = 255
+        # Set hue
+        h = pad["hue"]
+    return {
+        "mode": mode,
+        "group": group,
+        # Set LED value to max, or min (not lit) if this key has not got a mode
+        "val": VAL_MIN if mode == None else VAL_MAX,
+        # Precompute the LED bytes for each brightness level so the main loop does no HSV maths
+        "lut": [grb_bytes(hsv_to_rgb_int(h, s, (255 * k) // VAL_MAX)) for k in range(VAL_MAX + 1)],
+    }
+
+# Converts an RGB tuple to bytes in the trellis pixel order, ready to copy into a pixel buffer
+def grb_bytes(rgb):
+    return bytes((rgb[1], rgb[0], rgb[2]))
+
+# Moves each dirty pad's brightness towards its target by at most step and copies changed LED bytes into the
+# pixel buffers, returns True if any LED changed. All the per frame LED work is in this one call, taking plain
+# arrays so it could be replaced by a native module
+def ramp_fill(pixbuf_pad, pixbuf_at, luts, rgbs, vals, targets, dirtys, step):
+    # No LEDs changed yet
+    show = False
+    # Loop through pads
+    for i in range(16):
+        # LED is up to date ?
+        if not dirtys[i]:
+            # Skip this pad
+            continue
+        # Move towards target, by at most step
+        v = targets[i]
+        d = v - vals[i]
+        vals[i] = val = vals[i] + (step if d > step else (-step if d < -step else d))
+        # Look up the LED bytes in the precomputed table
+        rgb = luts[i][val]
+        # LED color changed ? (table entries are shared so identity is enough)
+        if rgb is not rgbs[i]:
+            # Note the new LED bytes
+            rgbs[i] = rgb
+            # Copy them into the pixel buffer
+            buf = pixbuf_pad[i]
+            at = pixbuf_at[i]
+            buf[at] = rgb[0]
+            buf[at + 1] = rgb[1]
+            buf[at + 2] = rgb[2]
+            # Need to send the buffer
+            show = True
+        # Reached the target value ?
+        if val == v:
+            # LED is up to date
+            dirtys[i] = False
+    return show
+
+# Presses a tuple of keycodes, all in one keyboard report
+def press_kcs(kcs):
+    _dbg(f'keycode press {kcs} {KC_LIVE}')
+    if KC_LIVE:
+        keyboard.press(*kcs)
+
+# Releases a tuple of keycodes, all in one keyboard report
+def release_kcs(kcs):
+    _dbg(f'keycode release {kcs} {KC_LIVE}')
+    if KC_LIVE:
+        keyboard.release(*kcs)
+
+# Timing in integer milliseconds, the trellis can only be read every 17 milliseconds or so
+TIME_TRELLIS = 18
+# Time for each brightness step, so fades run at the same speed however often the LEDs are updated
+TIME_STEP    = 10
+
+# Seesaw keypad event register, written directly to enable both edges for a key in one transaction
+KEYPAD_BASE  = 0x10
+KEYPAD_EVENT = 0x01
+# Active bits for the rising and falling edges, plus the enable bit
+KEYPAD_EDGES = (1 << (NeoTrellis.EDGE_RISING + 1)) | (1 << (NeoTrellis.EDGE_FALLING + 1)) | 1
+
+# Seesaw NeoPixel registers, the pixel data is written directly from preallocated buffers
+NEOPIXEL_BASE = 0x0E
+NEOPIXEL_BUF  = 0x04
+NEOPIXEL_SHOW = 0x05
+# Pixels sent in each buffer write, keeps each I2C transfer within the seesaw's 32 byte limit
+PIXELS_PER_WRITE = 8
+
+# Application class
+class App():
+
+    # Initialisation
+    def __init__(self):
+        # Set up NeoTrellis
+        self.i2c = board.I2C()
+        self.trellis = NeoTrellis(self.i2c)
+        self.trellis.brightness = 1.0
+        # Pixel buffers, each primed with the register and byte offset of its pixels so it can be written as is
+        self.pixbufs = []
+        for p in range(0, 16, PIXELS_PER_WRITE):
+            self.pixbufs.append(bytearray((NEOPIXEL_BASE, NEOPIXEL_BUF, (p * 3) >> 8, (p * 3) & 0xFF)) + bytearray(PIXELS_PER_WRITE * 3))
+        # Pixel buffer and position of each pad's LED bytes
+        self.pixbuf_pad = [self.pixbufs[i // PIXELS_PER_WRITE] for i in range(16)]
+        self.pixbuf_at  = [4 + (i % PIXELS_PER_WRITE) * 3 for i in range(16)]
+        # Show command
+        self.pixshow = bytes((NEOPIXEL_BASE, NEOPIXEL_SHOW))
+        # Add runtime data to config and configure trellis keys in one pass
+        for i, pad in enumerate(config):
+            # Add runtime data to config
+            pad.update(classify_pad(pad))
+            # activate rising and falling edge events on this key (seesaw keys are numbered 8 per row)
+            self.trellis.write(KEYPAD_BASE, KEYPAD_EVENT, bytes(((i >> 2) * 8 + (i & 3), KEYPAD_EDGES)))
+        # Runtime data as parallel arrays indexed by pad, config is only used to set these up
+        self.modes   = [c["mode"] for c in config]
+        self.groups  = [c["group"] for c in config]
+        # Keycodes are held as tuples for unpacking into keyboard calls
+        self.kcs_on  = [tuple(c["keycodes_on"]) for c in config]
+        self.kcs_off = [tuple(c["keycodes_off"]) if c["keycodes_off"] != None else None for c in config]
+        self.luts    = [c["lut"] for c in config]
+        self.vals    = [c["val"] for c in config]
+        # Target brightness, off (not lit) for pads with no mode
+        self.targets = [VAL_MIN if c["mode"] == None else VAL_OFF for c in config]
+        # LED bytes last written to each pixel buffer (none yet)
+        self.rgbs    = [None] * 16
+        # Pads down, pads on and LEDs needing an update (all of them to start)
+        self.downs   = bytearray(16)
+        self.ons     = bytearray(16)
+        self.dirtys  = bytearray(b"\x01" * 16)
+        # Note current time
+        now = ticks_ms()
+        # Set sync time
+        self.time_sync = ticks_add(now, TIME_TRELLIS)
+        # Set brightness step time
+        self.time_step = now
+
+    # Pad pressed handler
+    def press_handler(self, key_number):
+        _dbg(f'keypad press {key_number}')
+        # Pad is now down
+        self.downs[key_number] = True
+        # Normal pad ?
+        if self.modes[key_number] == "key":
+            # Press the on keycodes
+            press_kcs(self.kcs_on[key_number])
+        # Toggle pad ?
+        elif self.modes[key_number] == "toggle":
+            # Toggle is currently on ?
+            if self.ons[key_number]:
+                # Turn off
+                self.ons[key_number] = False
+                # Press the off keycodes
+                press_kcs(self.kcs_off[key_number])
+            # Toggle is currently off ?
+            else:
+                # Turn on
+                self.ons[key_number] = True
+                # Press the on keycodes
+                press_kcs(self.kcs_on[key_number])
+        # Grouped pad ?
+        elif self.modes[key_number] == "group":
+            # Turn on the pressed pad
+            self.ons[key_number] = True
+            # Press the on keycodes
+            press_kcs(self.kcs_on[key_number])
+            # Loop through pads
+            for i in range(16):
+                # Not the pad that has just been pressed ?
+                if i != key_number:
+                    # This pad is in the same group as the pad that has just been pressed ?
+                    if self.modes[i] == "group" and self.groups[i] == self.groups[key_number]:
+                        # The pad is on ?
+                        if self.ons[i]:
+                            # Turn it off
+                            self.ons[i] = False
+                            # Set val to minimum
+                            self.vals[i] = VAL_MIN
+                            # Update LED target
+                            self.retarget(i)
+        # Update LED target
+        self.retarget(key_number)
+
+    # Works out a pad's target brightness from its state, called whenever the state changes
+    def retarget(self, i):
+        # No mode ?
+        if self.modes[i] == None:
+            # Turn off LED
+            target = VAL_MIN
+        # Pad is down ?
+        elif self.downs[i]:
+            # Toggled off pads go to min brightness, toggled on, normal and grouped pads to full brightness
+            target = VAL_MIN if self.modes[i] == "toggle" and not self.ons[i] else VAL_MAX
+            # Go straight there
+            self.vals[i] = target
+        # Pad is on ?
+        elif self.ons[i]:
+            # Set target on brightness
+            target = VAL_ON
+        # Pad is off ?
+        else:
+            # Set target off brightness
+            target = VAL_OFF
+        # Set target
+        self.targets[i] = target
+        # LED needs updating
+        self.dirtys[i] = True
+
+    # Pad released handler
+    def release_handler(self, key_number):
+        _dbg(f'keypad release {key_number}')
+        # Pad is not down
+        self.downs[key_number] = False
+        # Update LED target
+        self.retarget(key_number)
+        # Normal pad ?
+        if self.modes[key_number] == "key":
+            # Release on keycodes
+            release_kcs(self.kcs_on[key_number])
+        # Toggle pad ?
+        elif self.modes[key_number] == "toggle":
+            # Pad has been toggled on ?
+            if self.ons[key_number]:
+                # Release on keycodes
+                release_kcs(self.kcs_on[key_number])
+            # Pad has just been turned off ?
+            else:
+                # Release off keycodes
+                release_kcs(self.kcs_off[key_number])
+        # Grouped pad
+        elif self.modes[key_number] == "group":
+            # Release on keycodes
+            release_kcs(self.kcs_on[key_number])
+
+    # Reads key events from the trellis and calls the handlers, in place of trellis.sync() and its callbacks
+    # Edge values are bound as defaults so they are local lookups
+    def read_keys(self, rising=NeoTrellis.EDGE_RISING, falling=NeoTrellis.EDGE_FALLING):
+        # Number of key events waiting
+        count = self.trellis.count
+        # Any events ?
+        if count:
+            # Brief pause before reading as the library does
+            time.sleep(0.0005)
+            # Read all the events, plus two as sometimes events are not counted
+            for raw in self.trellis.read_keypad(count + 2):
+                # Convert seesaw key number (8 per row) to pad number (4 per row)
+                key = (raw >> 2) & 0x3F
+                i = (key >> 3) * 4 + (key & 7)
+                # Not a pad (unused event) ?
+                if i >= 16:
+                    continue
+                # Pressed when a rising edge is detected
+                if raw & 0x3 == rising:
+                    self.press_handler(i)
+                # Released when a falling edge is detected
+                elif raw & 0x3 == falling:
+                    self.release_handler(i)
+
+    # Sends the pixel buffers to the trellis then shows them, without allocating
+    def show(self):
+        with self.trellis.i2c_device as i2c:
+            for buf in self.pixbufs:
+                i2c.write(buf)
+            i2c.write(self.pixshow)
+
+    # Main function - called repeatedly do not block
+    def main(self):
+        # Note current time
+        now = ticks_ms()
+        # Time to sync trellis? (ticks wrap so compare with ticks_diff)
+        if ticks_diff(now, self.time_sync) >= 0:
+            # Read key events and call the handlers
+            self.read_keys()
+            # Set time for next sync
+            self.time_sync = ticks_add(now, TIME_TRELLIS)
+        # LEDs needing an update
+        dirtys = self.dirtys
+        # All LEDs up to date ?
+        if not any(dirtys):
+            # Keep the step time current so the next fade starts from now
+            self.time_step = now
+            # Nothing to do
+            return
+        # Number of brightness steps due since the last update
+        steps = ticks_diff(now, self.time_step) // TIME_STEP
+        # Any steps due ? (with none the LEDs are still updated so jumps made by retarget() show at once)
+        if steps:
+            # Move the step time on by the steps taken
+            self.time_step = ticks_add(self.time_step, steps * TIME_STEP)
+        # Largest change in brightness allowed in this update
+        step = steps * VAL_STEP
+        # Update the LEDs, any changed ?
+        if ramp_fill(self.pixbuf_pad, self.pixbuf_at, self.luts, self.rgbs, self.vals, self.targets, dirtys, step):
+            # Send the pixel buffers to the trellis
+            self.show()
+
+# Application class END
\ No newline at end of file
@@ -38,6 +38,11 @@ from adafruit_neotrellis.neotrellis import NeoTrellis
 
 # Constants
 TIME_SYNC = 0.02 # NeoTrellis sync, buttons can only be read every 17ms, allow a bit longer
+# Seesaw keypad event register, written directly to enable both edges for a key in one transaction
+KEYPAD_BASE  = 0x10
+KEYPAD_EVENT = 0x01
+# Active bits for the rising and falling edges, plus the enable bit
+KEYPAD_EDGES = (1 << (NeoTrellis.EDGE_RISING + 1)) | (1 << (NeoTrellis.EDGE_FALLING + 1)) | 1
 
 # Application class
 class App():
@@ -50,24 +55,16 @@ class App():
         self.trellis = NeoTrellis(self.i2c)
         # Set the brightness value (0 to 1.0)
         self.trellis.brightness = 0.5
-        # Set all keys to blue and activate events
-        for i in range(16):
-            # Set LED to blue
-            self.trellis.pixels[i] = (0, 0, 255)
-            # Activate rising edge events on all keys
-            self.trellis.activate_key(i, NeoTrellis.EDGE_RISING)
-            # Activate falling edge events on all keys
-            self.trellis.activate_key(i, NeoTrellis.EDGE_FALLING)
-            # Set all keys to trigger the blink callback
-            self.trellis.callbacks[i] = self.key
-            # Briefly sleep
-            time.sleep(0.05)
-        # Turn off all keys
+        # Set all keys to off and activate events in one pass
         for i in range(16):
             # Set LED to off
             self.trellis.pixels[i] = (0, 0, 15)
-            # Briefly sleep
-            time.sleep(0.05) 
+            # Activate rising and falling edge events on all keys (seesaw keys are numbered 8 per row)
+            self.trellis.write(KEYPAD_BASE, KEYPAD_EVENT, bytes(((i >> 2) * 8 + (i & 3), KEYPAD_EDGES)))
+            # Set all keys to trigger the blink callback
+            self.trellis.callbacks[i] = self.key
+        # Briefly sleep to let the trellis settle
+        time.sleep(0.05)
         # Note current time
         now = time.monotonic()
         # Set sync time (20ms)